@@ -1,10 +1,20 @@
 import streamlit as st
 import requests
+import hashlib
+import io
 import os
+import re
 from dotenv import load_dotenv
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Optional
-from src.invasive_utils import show_aggrid
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from src.http_utils import SESSION, UPLOAD_TIMEOUT, LOOKUP_TIMEOUT, parse_json
+from src.invasive_utils import build_invasive_frames, show_aggrid
+from src.map_utils import show_invasive_map
+from src.utils import highlight_toxicity
+from src.wikipedia_utils import fetch_wikipedia_sections, fetch_wikipedia_summary, get_wikipedia_thumbnail, prefetch_wikipedia
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,6 +25,18 @@ st.write("📷 Upload a plant image to identify its species using the Pl@ntNet A
 
 
 # --- Utility Functions ---
+@dataclass
+class UIState:
+    """Per-session UI flags, kept together under a single session_state key."""
+    toxicity_show_more: bool = False
+    last_selected_name: Optional[str] = None
+    last_fs_name: Optional[str] = None
+
+
+def get_ui_state() -> UIState:
+    return st.session_state.setdefault('ui_state', UIState())
+
+
 def get_api_key() -> Optional[str]:
     api_key = os.getenv("PLANTNET_API_KEY")
     if not api_key:
@@ -23,16 +45,54 @@ def get_api_key() -> Optional[str]:
     return api_key
 
 
-@st.cache_data(show_spinner=False)
-def identify_plant(image_file, organ, api_key):
+# Pl@ntNet does not need more than this many pixels per side for a good match
+MAX_UPLOAD_SIDE = 1024
+
+
+def _downscale_image(raw, name, mime):
+    """
+    Shrink large photos to at most MAX_UPLOAD_SIDE pixels per side and re-encode them as JPEG.
+    Small images, and anything Pillow cannot read, are returned unchanged.
+    """
+    from PIL import Image, ImageOps
+    try:
+        with Image.open(io.BytesIO(raw)) as img:
+            if max(img.size) <= MAX_UPLOAD_SIDE:
+                return raw, name, mime
+            # Apply the EXIF rotation first, since re-encoding drops the orientation tag
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            img.thumbnail((MAX_UPLOAD_SIDE, MAX_UPLOAD_SIDE), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format='JPEG', quality=85, optimize=True)
+    except Exception:
+        return raw, name, mime
+    return buf.getvalue(), os.path.splitext(name)[0] + '.jpg', 'image/jpeg'
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _identify_plant_cached(digest, organ, api_key, _raw, _name, _mime):
+    """
+    Query Pl@ntNet for an image identified by the hash of its bytes.
+    Only digest, organ and api_key form the cache key, so re-uploads of the same image reuse the earlier response.
+    The response is shared across reruns and sessions without copying, so callers must treat it as read-only.
+    """
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
     url = f"https://my-api.plantnet.org/v2/identify/all?api-key={api_key}"
-    files = {'images': (image_file.name, image_file, image_file.type)}
-    # Always send a list for 'organs' for consistency and API clarity
-    data = {'organs': [organ] if organ != 'auto' else ['auto']}
+    # Resizing happens inside the cached call, so a repeat upload skips both the decode and the request
+    image_bytes, image_name, image_mime = _downscale_image(_raw, _name, _mime)
+    # Stream the multipart body from the bytes already read for hashing instead of re-reading the upload
+    body = MultipartEncoder(fields={'organs': organ, 'images': (image_name, image_bytes, image_mime)})
+    response = SESSION.post(url, data=body, headers={'Content-Type': body.content_type}, timeout=UPLOAD_TIMEOUT)
+    response.raise_for_status()
+    return parse_json(response)
+
+
+def identify_plant(image_file, organ, api_key):
+    raw = image_file.getvalue()
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
     try:
-        response = requests.post(url, files=files, data=data)
-        response.raise_for_status()
-        return response.json()
+        # Errors are raised out of the cached call so failed requests are retried rather than cached
+        return _identify_plant_cached(digest, organ, api_key, raw, image_file.name, image_file.type)
     except requests.exceptions.HTTPError as http_err:
         status_code = getattr(http_err.response, 'status_code', None)
         if status_code == 404:
@@ -47,61 +107,252 @@ def identify_plant(image_file, organ, api_key):
         return None
 
 
+RESULT_COLUMNS = {
+    'species.scientificNameWithoutAuthor': 'Scientific Name',
+    'species.commonNames': 'Common Names',
+    'species.genus.scientificNameWithoutAuthor': 'Genus',
+    'species.family.scientificNameWithoutAuthor': 'Family',
+    'score': 'Confidence Score',
+}
+
+
+@st.cache_data(show_spinner=False)
 def build_results_dataframe(results) -> pd.DataFrame:
-    table_data = []
-    for res in results:
-        species = res['species'].get('scientificNameWithoutAuthor', '')
-        common_names = ', '.join(res['species'].get('commonNames', []))
-        genus = res['species'].get('genus', {}).get('scientificNameWithoutAuthor', '')
-        family = res['species'].get('family', {}).get('scientificNameWithoutAuthor', '')
-        score = res.get('score', 0)
-        table_data.append({
-            'Scientific Name': species,
-            'Common Names': common_names,
-            'Genus': genus,
-            'Family': family,
-            'Confidence Score': f"{score:.2f}"
-        })
-    return pd.DataFrame(table_data)
-
-
-def query_invasive_species_database(scientific_name):
+    # Flatten the nested Pl@ntNet results in one go; reindex keeps columns missing from every result
+    df = pd.json_normalize(results).reindex(columns=list(RESULT_COLUMNS)).rename(columns=RESULT_COLUMNS)
+    df['Common Names'] = df['Common Names'].map(lambda names: ', '.join(names) if isinstance(names, list) else '')
+    df['Confidence Score'] = df['Confidence Score'].fillna(0).map('{:.2f}'.format)
+    return df.fillna('')
+
+
+# Upper bound on Forest Service records fetched per query
+MAX_INVASIVE_RECORDS = 2000
+
+
+# The Forest Service dataset changes at most daily
+@st.cache_data(ttl=86400, show_spinner=False)
+def _query_invasive_species_cached(scientific_names):
+    """
+    Query Forest Service records for several species in a single request.
+    Returns a dict mapping each lower-cased scientific name that has records to a {'features': [...]} payload.
+    Transport and ArcGIS errors are raised out of the cache so they are retried instead of cached for a day.
+    """
     url = "https://apps.fs.usda.gov/arcx/rest/services/EDW/EDW_InvasiveSpecies_01/MapServer/0/query"
     out_fields = [
         "NRCS_PLANT_CODE", "SCIENTIFIC_NAME", "COMMON_NAME", "PROJECT_CODE", "PLANT_STATUS",
         "FS_UNIT_NAME", "EXAMINERS", "LAST_UPDATE"
     ]
+    # Quote each name as an SQL string literal so apostrophes cannot break the filter
+    safe_names = ",".join("'" + name.strip().replace("'", "''") + "'" for name in scientific_names)
     params = {
-        'where': f"SCIENTIFIC_NAME='{scientific_name}'",
+        'where': f"SCIENTIFIC_NAME IN ({safe_names})",
         'outFields': ",".join(out_fields),
         'returnGeometry': 'true',
+        # Ask for WGS84 coordinates at ~1 m precision plus a server-side centroid for polygons
+        'outSR': '4326',
+        'geometryPrecision': '5',
+        'returnCentroid': 'true',
+        'resultRecordCount': MAX_INVASIVE_RECORDS,
         'f': 'json'
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json()
-    return None
+    response = SESSION.get(url, params=params, timeout=LOOKUP_TIMEOUT)
+    response.raise_for_status()
+    data = parse_json(response)
+    # ArcGIS reports query errors with a 200 status and an 'error' object instead of features
+    if 'error' in data:
+        raise ValueError(f"ArcGIS query failed: {data['error'].get('message', data['error'])}")
+    if data.get('exceededTransferLimit') and len(scientific_names) > 1:
+        # The batch hit the record cap; query the names one by one so no species is starved
+        by_name = {}
+        for name in scientific_names:
+            by_name.update(_query_invasive_species_cached((name,)))
+        return by_name
+    by_name = {}
+    for feature in data.get('features', []):
+        name = str(feature.get('attributes', {}).get('SCIENTIFIC_NAME') or '').strip().lower()
+        by_name.setdefault(name, {'features': []})['features'].append(feature)
+    return by_name
+
+
+def query_invasive_species_database(scientific_names):
+    """
+    Look up Forest Service records for the given names.
+    Returns the grouped records, or None if the service could not be queried.
+    """
+    try:
+        return _query_invasive_species_cached(tuple(scientific_names))
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+PREFETCH_WIKIPEDIA_TOP_N = 3
+# Section warm-ups download the full article, so only the default selection gets one
+PREFETCH_SECTIONS_TOP_N = 1
+# Passed identically by the prefetch and the detail fetch so both hit the same cache entry
+WIKIPEDIA_SECTIONS = ["Invasive species", "Toxicity"]
+
+
+def _script_thread_pool(max_workers):
+    """ThreadPoolExecutor whose workers carry the current script context, so cached calls and st.error work inside them."""
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx()))
+
+
+def prefetch_species_data(scientific_names):
+    """
+    Fetch Forest Service records for every candidate species in one request while warming
+    the Wikipedia summary and section caches for the top matches in the background.
+    Returns the records grouped by name, or None if the Forest Service could not be queried.
+    """
+    executor = _script_thread_pool(1 + PREFETCH_WIKIPEDIA_TOP_N)
+    fs_future = executor.submit(query_invasive_species_database, scientific_names)
+    for rank, name in enumerate(scientific_names[:PREFETCH_WIKIPEDIA_TOP_N]):
+        executor.submit(prefetch_wikipedia, name, WIKIPEDIA_SECTIONS if rank < PREFETCH_SECTIONS_TOP_N else None)
+    # Only the Forest Service lookup is awaited; the Wikipedia warm-ups finish without holding up the tabs
+    executor.shutdown(wait=False)
+    return fs_future.result()
+
+
+def fetch_species_details(scientific_name):
+    """
+    Fetch the Wikipedia summary and sections for a species concurrently.
+    Returns a dict with 'summary', 'invasive_section' and 'toxicity_section' entries, plus 'failed',
+    which is True when a request errored (as opposed to the page or section not existing).
+    """
+    with _script_thread_pool(2) as executor:
+        summary = executor.submit(fetch_wikipedia_summary, scientific_name)
+        sections = executor.submit(fetch_wikipedia_sections, scientific_name, WIKIPEDIA_SECTIONS)
+    details = {'summary': None, 'invasive_section': None, 'toxicity_section': None, 'failed': False}
+    try:
+        details['summary'] = summary.result()
+    except Exception as e:
+        st.error(f"Wikipedia request failed: {e}")
+        details['failed'] = True
+    try:
+        section_texts = sections.result()
+        details['invasive_section'] = section_texts["Invasive species"]
+        details['toxicity_section'] = section_texts["Toxicity"]
+    except Exception as e:
+        st.error(f"Wikipedia section fetch failed: {e}")
+        details['failed'] = True
+    return details
+
+
+TOXICITY_PREVIEW_WORDS = 150
+TOXICITY_VIEW_CACHE_SIZE = 64
+_TOX_BQ_OPEN = '<blockquote style="background:#fff6f6;border-left:5px solid #b30000;padding:1em 1.5em;border-radius:6px;margin:0 0 1em 0;font-size:1.05em;line-height:1.7;color:#222;">'
+_TOX_BQ_CLOSE = '</blockquote>'
+
+
+@st.cache_data(show_spinner=False, max_entries=TOXICITY_VIEW_CACHE_SIZE)
+def get_toxicity_view(toxicity_section):
+    """
+    Return (pretty_html, short_html, needs_more) for a species' toxicity text.
+    Cached on the text, so the Show more/less toggle never re-highlights or re-splits it.
+    """
+    words = toxicity_section.split()
+    # Truncate before highlighting so the preview never cuts through a <span> tag
+    pretty_text = highlight_toxicity(toxicity_section).replace('\n', '<br>')
+    short_text = highlight_toxicity(' '.join(words[:TOXICITY_PREVIEW_WORDS])) + '...'
+    return pretty_text, short_text, len(words) > TOXICITY_PREVIEW_WORDS
+
+
+
+def _set_toxicity_show_more(value):
+    get_ui_state().toxicity_show_more = value
+
+
+@st.fragment
+def show_toxicity_block(toxicity_section):
+    """
+    Render the toxicity blockquote with its Show more/less toggle.
+    Runs as a fragment, so the toggle reruns only this block instead of the whole app.
+    """
+    pretty_text, short_text, needs_more = get_toxicity_view(toxicity_section)
+    collapsed = needs_more and not get_ui_state().toxicity_show_more
+    st.markdown(_TOX_BQ_OPEN + (short_text if collapsed else pretty_text) + _TOX_BQ_CLOSE, unsafe_allow_html=True)
+    if needs_more:
+        # The callback flips the flag before the fragment reruns, so no explicit st.rerun is needed
+        st.button(
+            "➕ Show more" if collapsed else "➖ Show less",
+            key="toxicity_toggle_button",
+            on_click=_set_toxicity_show_more,
+            args=(collapsed,),
+        )
+
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(T|$)")
+_EPOCH_DIGITS_RE = re.compile(r"^\d{10,}")
+
+
+def _epoch_to_datetime(numbers):
+    """Convert epoch seconds or milliseconds in one pass, picking the unit from the median magnitude."""
+    unit = 'ms' if numbers.median() >= 1e11 else 's'
+    return pd.to_datetime(numbers, unit=unit, errors='coerce')
+
+
+def normalize_date_columns(df, sort_desc_by=None):
+    """
+    Return df with ISO-date and epoch columns formatted as YYYY-MM-DD.
+    Each column is classified once, from its dtype and a small sample, before a single to_datetime call.
+    If sort_desc_by names a converted column, rows are sorted newest first on its parsed datetimes.
+    """
+    df = df.copy()
+    sort_key = None
+    for col in df.columns:
+        # dtype.kind: 'O' covers object and pandas string columns, 'iuf' the numeric ones
+        kind = df[col].dtype.kind
+        if kind in 'OSU':
+            # Sample from the first non-null value on, so leading gaps neither hide a date column
+            # nor make dropna and astype touch the whole column
+            first = df[col].first_valid_index()
+            if first is None:
+                continue
+            sample = df[col].loc[first:].head(20).dropna().astype(str)
+            if sample.str.match(_ISO_DATE_RE).any():
+                dt = pd.to_datetime(df[col], format='ISO8601', errors='coerce')
+            elif sample.str.match(_EPOCH_DIGITS_RE).any():
+                dt = _epoch_to_datetime(pd.to_numeric(df[col], errors='coerce'))
+            else:
+                continue
+        elif kind in 'iuf':
+            if not df[col].abs().median() >= 1e9:
+                continue
+            dt = _epoch_to_datetime(df[col])
+        else:
+            continue
+        if col == sort_desc_by:
+            sort_key = dt
+        df[col] = dt.dt.strftime('%Y-%m-%d')
+    if sort_key is not None:
+        # Sort on the datetimes already parsed above rather than re-parsing the formatted strings
+        df = df.assign(_sort_key=sort_key.to_numpy()).sort_values('_sort_key', ascending=False, na_position='last').drop(columns='_sort_key')
+    return df
 
 
 # --- Tab Functions ---
-def show_plantnet_tab(plantnet_df, scientific_names):
+def show_plantnet_tab(plantnet_df):
     st.markdown("### 🌱 PlantNet Identification Results")
     if not plantnet_df.empty:
-        selected_name = st.selectbox(
-            "🔬 Select a scientific name:",
-            scientific_names,
-            key="plantnet_scientific_name_select"
+        st.caption("🔬 Click a row to select a scientific name.")
+        event = st.dataframe(
+            plantnet_df,
+            use_container_width=True,
+            hide_index=True,
+            selection_mode='single-row',
+            on_select='rerun',
+            key="plantnet_table"
         )
-        selected_row = plantnet_df[plantnet_df['Scientific Name'] == selected_name].iloc[0].to_dict() if selected_name in plantnet_df['Scientific Name'].values else plantnet_df.iloc[0].to_dict()
-        if 'toxicity_show_more' in st.session_state and st.session_state.get('last_selected_name') != selected_name:
-            st.session_state['toxicity_show_more'] = False
-        st.session_state['last_selected_name'] = selected_name
+        selected_rows = event.selection.rows
+        selected_row = plantnet_df.iloc[selected_rows[0] if selected_rows else 0].to_dict()
+        selected_name = selected_row['Scientific Name']
+        ui_state = get_ui_state()
+        if ui_state.last_selected_name != selected_name:
+            ui_state.toxicity_show_more = False
+            ui_state.last_selected_name = selected_name
         if not selected_name:
-            st.info("Select a scientific name from the dropdown to see its details below.")
+            st.info("Select a scientific name in the table to see its details below.")
             return None
-        st.markdown("#### 🪴 Selected Plant Details")
-        for k, v in selected_row.items():
-            st.write(f"**{k}:** {v}")
+        # One markdown element instead of one st.write per field
+        st.markdown("#### 🪴 Selected Plant Details\n\n" + "  \n".join(f"**{k}:** {v}" for k, v in selected_row.items()))
         return selected_name
     else:
         st.info("ℹ️ No PlantNet results to display.")
@@ -111,31 +362,7 @@ def show_plantnet_tab(plantnet_df, scientific_names):
 def show_forest_tab(invasive_df):
     st.markdown("### 🌲 Invasive Species Table (Forest Service)")
     if not invasive_df.empty:
-        # Convert and sort by 'Updated' column if present
-        for col in invasive_df.columns:
-            col_dtype = invasive_df[col].dtype
-            if pd.api.types.is_object_dtype(col_dtype):
-                sample = invasive_df[col].dropna().astype(str).head(10)
-                if sample.str.match(r"^\d{4}-\d{2}-\d{2}T").any() or sample.str.match(r"^\d{4}-\d{2}-\d{2}$").any():
-                    invasive_df[col] = pd.to_datetime(invasive_df[col], errors='coerce').dt.strftime('%Y-%m-%d')
-                elif sample.str.match(r"^\d{12,}").any() or sample.str.match(r"^\d{10,}").any():
-                    dt = pd.to_datetime(invasive_df[col], errors='coerce', unit='ms')
-                    if dt.isna().all():
-                        dt = pd.to_datetime(invasive_df[col], errors='coerce', unit='s')
-                    invasive_df[col] = dt.dt.strftime('%Y-%m-%d')
-            elif pd.api.types.is_integer_dtype(col_dtype) or pd.api.types.is_float_dtype(col_dtype):
-                sample = invasive_df[col].dropna().astype(str).head(10)
-                if sample.str.match(r"^\d{12,}").any() or sample.str.match(r"^\d{10,}").any():
-                    dt = pd.to_datetime(invasive_df[col], errors='coerce', unit='ms')
-                    if dt.isna().all():
-                        dt = pd.to_datetime(invasive_df[col], errors='coerce', unit='s')
-                    invasive_df[col] = dt.dt.strftime('%Y-%m-%d')
-        if 'Updated' in invasive_df.columns:
-            try:
-                invasive_df['Updated_sort'] = pd.to_datetime(invasive_df['Updated'], errors='coerce')
-                invasive_df = invasive_df.sort_values('Updated_sort', ascending=False).drop(columns=['Updated_sort'])
-            except Exception:
-                pass
+        invasive_df = normalize_date_columns(invasive_df, sort_desc_by='Updated')
         show_aggrid(invasive_df, grid_key="invasive_grid")
     else:
         st.info("ℹ️ No invasive species records found.")
@@ -151,25 +378,31 @@ def show_summary_tab(summary_df):
 
 def show_map_tab(invasive_map_df):
     st.markdown("### 🗺️ Invasive Species Map")
-    from src.map_utils import show_invasive_map
     if not invasive_map_df.empty and {'lat', 'lon'}.issubset(invasive_map_df.columns):
         show_invasive_map(invasive_map_df, width=800, height=600)
     else:
         st.info("🗺️ No map data available for this species.")
 
 
-def show_wikipedia_tab(selected_scientific_name):
-    from src.wikipedia_utils import get_wikipedia_summary
+def show_wikipedia_tab(selected_scientific_name, details):
     st.markdown("### 📚 Wikipedia Info")
     if selected_scientific_name:
-        wiki = get_wikipedia_summary(selected_scientific_name)
+        wiki = details.get('summary')
         if wiki:
             st.markdown(f"#### [{wiki.get('title', selected_scientific_name)}]({wiki.get('content_urls',{}).get('desktop',{}).get('page','')}) 📖")
             if wiki.get('thumbnail') and wiki['thumbnail'].get('source'):
-                st.image(wiki['thumbnail']['source'], width=200)
+                thumb_url = wiki['thumbnail']['source']
+                st.image(get_wikipedia_thumbnail(thumb_url) or thumb_url, width=200)
             st.markdown(wiki.get('extract', 'No summary available.'))
         else:
             st.info("ℹ️ No Wikipedia summary found.")
+        invasive_section = details.get('invasive_section')
+        if invasive_section:
+            st.markdown("#### 🦠 Invasive Species\n\n" + invasive_section)
+        toxicity_section = details.get('toxicity_section')
+        if toxicity_section:
+            st.markdown("#### ☠️ Toxicity")
+            show_toxicity_block(toxicity_section)
     else:
         st.info("ℹ️ No plant selected for Wikipedia lookup.")
 
@@ -194,11 +427,17 @@ def main():
     if reset:
         st.session_state.clear()
         st.rerun()
+    if submitted and uploaded_file:
+        # Keep the results on screen for reruns triggered outside the form (selectbox, Show more)
+        st.session_state['identify_requested'] = True
+        # A new identification refreshes the Forest Service lookup, Wikipedia warm-up and species details below
+        st.session_state.pop('fs_by_name', None)
+        get_ui_state().last_fs_name = None
     if not uploaded_file and not submitted:
         st.info("Please upload an image to begin.")
         return
-    if submitted and uploaded_file:
-        st.image(uploaded_file, caption="Uploaded plant image", width=150)
+    if uploaded_file and st.session_state.get('identify_requested'):
+        st.image(uploaded_file.getvalue(), caption="Uploaded plant image", width=150)
         api_key = get_api_key()
         if not api_key:
             return
@@ -209,16 +448,16 @@ def main():
             st.error("❌ The uploaded image could not be recognized as a plant. Please try a different image, ensure the plant is clearly visible, or check your input.")
             return
         df = build_results_dataframe(result['results'])
-        plantnet_df = df.copy()
-        invasive_df = pd.DataFrame()
-        summary_df = pd.DataFrame()
-        invasive_map_df = pd.DataFrame()
+        empty_frames = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
         selected_scientific_name = None
-        scientific_names = df['Scientific Name'].tolist() if 'Scientific Name' in df.columns else []
-        if not scientific_names:
+        if df.empty:
             st.error("❌ No recognizable plant species found in the image. Please try another image.")
             return
-        # Query invasive species database for the selected scientific name (will be set in Tab 1)
+        # Query the invasive species database once per identification for every candidate; Tab 1 looks up
+        # the selected name. A failed lookup (None) is retried on the next rerun.
+        if st.session_state.get('fs_by_name') is None:
+            with st.spinner("🌲 Checking invasive species records..."):
+                st.session_state['fs_by_name'] = prefetch_species_data(df['Scientific Name'].tolist())
         fs_results = None
         tab1, tab2, tab3, tab4, tab5 = st.tabs([
             "🌱 Pl@ntNet Data",
@@ -228,57 +467,30 @@ def main():
             "📚 Wikipedia Info"
         ])
         with tab1:
-            selected_scientific_name = show_plantnet_tab(plantnet_df, scientific_names)
-            if selected_scientific_name:
-                fs_results = query_invasive_species_database(selected_scientific_name)
-                if fs_results:
-                    features = fs_results.get('features', [])
-                    FIELD_LABELS = {
-                        'NRCS_PLANT_CODE': '🆔 NRCS Plant Code',
-                        'SCIENTIFIC_NAME': '🔬 Scientific Name',
-                        'COMMON_NAME': '🌱 Common Name',
-                        'PROJECT_CODE': '📁 Project Code',
-                        'PLANT_STATUS': '🚦 Plant Status',
-                        'FS_UNIT_NAME': '🏞️ Forest Name',
-                        'EXAMINERS': '🧑‍🔬 Examiners',
-                        'LAST_UPDATE': 'Updated',
-                    }
-                    data = []
-                    invasive_points = []
-                    for feature in features:
-                        attributes = feature.get('attributes', {})
-                        row = {label: attributes.get(key, '') for key, label in FIELD_LABELS.items()}
-                        data.append(row)
-                        geom = feature.get('geometry', {})
-                        name = attributes.get('FS_UNIT_NAME', '')
-                        if 'x' in geom and 'y' in geom:
-                            lon, lat = geom['x'], geom['y']
-                            invasive_points.append({'lat': lat, 'lon': lon, 'orig_name': name})
-                        elif 'rings' in geom and geom['rings']:
-                            largest_ring = max(geom['rings'], key=lambda ring: len(ring))
-                            xs = [pt[0] for pt in largest_ring]
-                            ys = [pt[1] for pt in largest_ring]
-                            lon = float(sum(xs) / len(xs))
-                            lat = float(sum(ys) / len(ys))
-                            invasive_points.append({'lat': lat, 'lon': lon, 'orig_name': name})
-                    invasive_df = pd.DataFrame(data)
-                    invasive_map_df = pd.DataFrame(invasive_points)
-                    unit_col = '🏞️ Forest Name'
-                    if unit_col in invasive_df.columns:
-                        summary_df = invasive_df.groupby(unit_col).size().reset_index(name='🧾 Record Count')
-                        summary_df = summary_df.sort_values('🧾 Record Count', ascending=False)
-                st.session_state['invasive_df'] = invasive_df
-                st.session_state['summary_df'] = summary_df
-                st.session_state['invasive_map_df'] = invasive_map_df
+            selected_scientific_name = show_plantnet_tab(df)
+            ui_state = get_ui_state()
+            fs_by_name = st.session_state['fs_by_name']
+            if fs_by_name is None:
+                st.warning("⚠️ Forest Service records could not be loaded right now. Please try again later.")
+            # Reruns that keep the same species (tab clicks, the toxicity toggle) reuse the stored frames and details
+            if selected_scientific_name and ui_state.last_fs_name != selected_scientific_name:
+                details = fetch_species_details(selected_scientific_name)
+                fs_results = (fs_by_name or {}).get(selected_scientific_name.strip().lower())
+                st.session_state['fs_frames'] = build_invasive_frames(fs_results) if fs_results else empty_frames
                 st.session_state['selected_scientific_name'] = selected_scientific_name
+                st.session_state['species_details'] = details
+                # Empty answers (no records, no article) are final; only failed lookups are retried on the next rerun
+                if fs_by_name is not None and not details['failed']:
+                    ui_state.last_fs_name = selected_scientific_name
+        invasive_df, summary_df, invasive_map_df = st.session_state.get('fs_frames', empty_frames)
         with tab2:
-            show_forest_tab(st.session_state.get('invasive_df', pd.DataFrame()))
+            show_forest_tab(invasive_df)
         with tab3:
-            show_summary_tab(st.session_state.get('summary_df', pd.DataFrame()))
+            show_summary_tab(summary_df)
         with tab4:
-            show_map_tab(st.session_state.get('invasive_map_df', pd.DataFrame()))
+            show_map_tab(invasive_map_df)
         with tab5:
-            show_wikipedia_tab(st.session_state.get('selected_scientific_name', None))
+            show_wikipedia_tab(st.session_state.get('selected_scientific_name', None), st.session_state.get('species_details', {}))
 
 
 if __name__ == "__main__":
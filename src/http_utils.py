@@ -0,0 +1,31 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+# Shared session so repeated calls to the same host reuse pooled keep-alive connections
+SESSION = requests.Session()
+# make_headers only advertises encodings urllib3 can decode here (br needs the brotli package)
+SESSION.headers.update(make_headers(accept_encoding=True))
+SESSION.headers['User-Agent'] = 'plantIdentification/1.0 (+https://github.com/zschaudhry/plantIdentification)'
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    # Retry idempotent requests on transient gateway errors; the final response is still returned to the caller
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False),
+))
+
+# (connect, read) timeouts so a stalled upstream cannot hang a script run
+UPLOAD_TIMEOUT = (3.05, 30)
+LOOKUP_TIMEOUT = (3.05, 10)
+
+
+def parse_json(response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
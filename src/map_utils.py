@@ -1,6 +1,8 @@
 import streamlit as st
 import pydeck as pdk
 
+MAX_MAP_POINTS = 10_000
+
 def show_invasive_map(invasive_map_df, width=800, height=600):
     """
     Display an interactive heatmap of invasive species points using pydeck (Deck.gl).
@@ -8,10 +10,15 @@ def show_invasive_map(invasive_map_df, width=800, height=600):
     if invasive_map_df.empty or not {'lat', 'lon'}.issubset(invasive_map_df.columns):
         st.info("No map data available.")
         return
-    df = invasive_map_df.dropna(subset=['lat', 'lon']).copy()
+    df = invasive_map_df.dropna(subset=['lat', 'lon'])
     if df.empty:
         st.info("No valid map coordinates available.")
         return
+    # Centre on all points in one pass over both columns
+    center_lat, center_lon = df[['lat', 'lon']].to_numpy(dtype=float).mean(axis=0)
+    if len(df) > MAX_MAP_POINTS:
+        # A fixed-seed sample keeps the heatmap's shape without shipping every point to the browser
+        df = df.sample(MAX_MAP_POINTS, random_state=0)
     layer = pdk.Layer(
         "HeatmapLayer",
         data=df,
@@ -22,8 +29,8 @@ def show_invasive_map(invasive_map_df, width=800, height=600):
         get_position='[lon, lat]'
     )
     view_state = pdk.ViewState(
-        latitude=df['lat'].mean(),
-        longitude=df['lon'].mean(),
+        latitude=float(center_lat),
+        longitude=float(center_lon),
         zoom=5,
         pitch=0,
     )
@@ -1,17 +1,17 @@
 import re
 
+# Warning words are matched in a single pass; group 1 holds the severe words, group 2 the irritants
+_TOX_RE = re.compile(r'(?i)(danger(?:ous)?|toxic(?:ity)?|poison(?:ous)?)|(allergic|anaphylaxis|rash|blister|itch)')
+_SEVERE_SPAN = '<span style="color:#b30000; font-weight:bold;">{}</span>'
+_IRRITANT_SPAN = '<span style="color:#e67300; font-weight:bold;">{}</span>'
+
+
+def _highlight_match(match):
+    return (_SEVERE_SPAN if match.group(1) else _IRRITANT_SPAN).format(match.group(0))
+
+
 def highlight_toxicity(text):
     """
     Highlights warning words in toxicity text for better visibility in the UI.
     """
-    highlight_words = [
-        (r'(?i)danger(ous)?', '<span style="color:#b30000; font-weight:bold;">\\g<0></span>'),
-        (r'(?i)toxic(ity)?', '<span style="color:#b30000; font-weight:bold;">\\g<0></span>'),
-        (r'(?i)poison(ous)?', '<span style="color:#b30000; font-weight:bold;">\\g<0></span>'),
-        (r'(?i)allergic', '<span style="color:#e67300; font-weight:bold;">\\g<0></span>'),
-        (r'(?i)anaphylaxis', '<span style="color:#e67300; font-weight:bold;">\\g<0></span>'),
-        (r'(?i)rash|blister|itch', '<span style="color:#e67300; font-weight:bold;">\\g<0></span>'),
-    ]
-    for pattern, repl in highlight_words:
-        text = re.sub(pattern, repl, text)
-    return text
+    return _TOX_RE.sub(_highlight_match, text)
@@ -1,70 +1,171 @@
-import requests
+import functools
 import re
 import streamlit as st
-from typing import Optional
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import quote
+from src.http_utils import SESSION, LOOKUP_TIMEOUT, parse_json
+
+WIKIPEDIA_API = "https://en.wikipedia.org/w/api.php"
+# Article text changes slowly, but cached lookups should still pick up edits within the hour
+WIKIPEDIA_CACHE_TTL = 3600
+_HEADING_RE = re.compile(r'<h([1-6])\b[^>]*>.*?</h\1>', re.DOTALL | re.IGNORECASE)
+_BRACKETS_RE = re.compile(r'\[[^\]]*\]')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_BRACES_RE = re.compile(r'\{[^\}]*\}', re.DOTALL)
+
+class _TextExtractor(HTMLParser):
+    """Collects the text of an HTML fragment in one pass, skipping <style> and <sup> (citation) content."""
+    SKIPPED_TAGS = ('style', 'sup')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    # Entities stay encoded, as before, so escaped markup in the text never becomes live HTML
+    def handle_entityref(self, name):
+        self.handle_data(f'&{name};')
+
+    def handle_charref(self, name):
+        self.handle_data(f'&#{name};')
 
 def _clean_wikipedia_html(html: str) -> str:
     """Helper to clean up Wikipedia HTML and artifacts."""
-    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL)
-    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
-    html = re.sub(r'<sup[^>]*>.*?</sup>', '', html, flags=re.DOTALL)
-    html = re.sub(r'<a [^>]+>(.*?)</a>', r'\1', html, flags=re.DOTALL)
-    clean_text = re.sub('<[^<]+?>', '', html)
-    clean_text = re.sub(r'\[[^\]]*\]', '', clean_text)
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    clean_text = _BRACKETS_RE.sub('', ''.join(parser.parts))
     clean_text = '\n'.join([line for line in clean_text.splitlines() if not line.strip().startswith('^')])
-    clean_text = re.sub(r'/\*.*?\*/', '', clean_text, flags=re.DOTALL)
-    clean_text = re.sub(r'\{[^\}]*\}', '', clean_text, flags=re.DOTALL)
+    clean_text = _CSS_COMMENT_RE.sub('', clean_text)
+    clean_text = _BRACES_RE.sub('', clean_text)
     clean_text = '\n'.join([line for line in clean_text.splitlines() if line.strip()])
     return clean_text.strip()
 
-def get_wikipedia_section(scientific_name: str, section_title: str) -> Optional[str]:
+def _slice_section_html(html: str, anchor: str) -> Optional[str]:
+    """Returns the page HTML between a section's heading and the next heading of the same or higher level."""
+    marker = f'id="{escape(anchor)}"'
+    headings = list(_HEADING_RE.finditer(html))
+    for i, heading in enumerate(headings):
+        if marker in heading.group(0):
+            level = int(heading.group(1))
+            end = next((h.start() for h in headings[i + 1:] if int(h.group(1)) <= level), len(html))
+            return html[heading.end():end]
+    return None
+
+@st.cache_data(ttl=WIKIPEDIA_CACHE_TTL, show_spinner=False, max_entries=512)
+def fetch_wikipedia_sections(scientific_name: str, section_titles: List[str]) -> Dict[str, Optional[str]]:
     """
-    Fetches a specific section (by title) from a Wikipedia page for the given scientific name.
-    Returns the section text if found, else None.
+    Fetches several sections (by title) from a Wikipedia page in one parse request and slices them locally.
+    Raises on transport and API errors so that only real answers, including "no such page", are cached.
     """
-    api_base = "https://en.wikipedia.org/w/api.php"
+    sections = dict.fromkeys(section_titles)
     params = {
         "action": "parse",
         "page": scientific_name,
-        "prop": "sections",
+        "prop": "text|sections",
+        "disableeditsection": 1,
+        "disablelimitreport": 1,
         "format": "json"
     }
+    resp = SESSION.get(WIKIPEDIA_API, params=params, timeout=LOOKUP_TIMEOUT)
+    resp.raise_for_status()
+    data = parse_json(resp)
+    error = data.get("error")
+    if error:
+        # A missing article is a stable answer; anything else (rate limits, maxlag, ...) must be retried
+        if error.get("code") == "missingtitle":
+            return sections
+        raise RuntimeError(f"{error.get('code')}: {error.get('info')}")
+    parsed = data.get("parse", {})
+    html = parsed.get("text", {}).get("*", "")
+    anchors = {}
+    for sec in parsed.get("sections", []):
+        anchors.setdefault(sec.get("line", "").lower(), sec.get("anchor"))
+    for title in section_titles:
+        anchor = anchors.get(title.lower())
+        section_html = _slice_section_html(html, anchor) if anchor else None
+        if section_html is not None:
+            sections[title] = _clean_wikipedia_html(section_html)
+    return sections
+
+def get_wikipedia_sections(scientific_name: str, section_titles: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Fetches several sections (by title) from a Wikipedia page for the given scientific name.
+    Returns a dict mapping each requested title to its text, or None if not found or the fetch failed.
+    """
     try:
-        resp = requests.get(api_base, params=params)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
-        sections = data.get("parse", {}).get("sections", [])
-        section_index = None
-        for sec in sections:
-            if sec.get("line", "").lower() == section_title.lower():
-                section_index = sec.get("index")
-                break
-        if not section_index:
-            return None
-        params2 = {
-            "action": "parse",
-            "page": scientific_name,
-            "prop": "text",
-            "section": section_index,
-            "format": "json"
-        }
-        resp2 = requests.get(api_base, params=params2)
-        if resp2.status_code != 200:
-            return None
-        data2 = resp2.json()
-        html = data2.get("parse", {}).get("text", {}).get("*", "")
-        return _clean_wikipedia_html(html)
+        return fetch_wikipedia_sections(scientific_name, section_titles)
     except Exception as e:
         st.error(f"Wikipedia section fetch failed: {e}")
+        return dict.fromkeys(section_titles)
+
+def prefetch_wikipedia(scientific_name: str, section_titles: Optional[List[str]] = None) -> None:
+    """
+    Warms the summary (and, if given, section) caches for a species from a background thread.
+    Failures are swallowed here and left for the foreground lookup to retry and report.
+    """
+    try:
+        fetch_wikipedia_summary(scientific_name)
+        if section_titles:
+            fetch_wikipedia_sections(scientific_name, section_titles)
+    except Exception:
+        pass
+
+def get_wikipedia_section(scientific_name: str, section_title: str) -> Optional[str]:
+    """
+    Fetches a specific section (by title) from a Wikipedia page for the given scientific name.
+    Returns the section text if found, else None.
+    """
+    return get_wikipedia_sections(scientific_name, [section_title])[section_title]
+
+@functools.lru_cache(maxsize=256)
+def _wiki_summary_url(scientific_name: str) -> str:
+    """Build the REST summary URL, percent-encoding titles with diacritics, ampersands or slashes."""
+    return f"https://en.wikipedia.org/api/rest_v1/page/summary/{quote(scientific_name.replace(' ', '_'), safe='')}"
+
+@st.cache_data(ttl=WIKIPEDIA_CACHE_TTL, show_spinner=False, max_entries=512)
+def fetch_wikipedia_summary(scientific_name: str) -> Optional[dict]:
+    """
+    Fetches the REST summary for a page, or None if the page does not exist.
+    Raises on any other failure, like _identify_plant_cached, so errors are retried rather than cached.
+    """
+    resp = SESSION.get(_wiki_summary_url(scientific_name), timeout=LOOKUP_TIMEOUT)
+    if resp.status_code == 404:
         return None
+    resp.raise_for_status()
+    return parse_json(resp)
 
 def get_wikipedia_summary(scientific_name: str) -> Optional[dict]:
-    wiki_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{scientific_name.replace(' ', '_')}"
     try:
-        resp = requests.get(wiki_url)
-        if resp.status_code == 200:
-            return resp.json()
+        return fetch_wikipedia_summary(scientific_name)
     except Exception as e:
         st.error(f"Wikipedia request failed: {e}")
+        return None
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def get_wikipedia_thumbnail(url: str) -> Optional[bytes]:
+    """
+    Downloads a Wikipedia thumbnail once so reruns hand st.image cached bytes instead of a URL.
+    Returns None if the image could not be fetched.
+    """
+    try:
+        resp = SESSION.get(url, timeout=LOOKUP_TIMEOUT)
+        if resp.status_code == 200:
+            return resp.content
+    except Exception:
+        pass
     return None